@@ -1,14 +1,177 @@
+import io
 import os
 import re
+import sys
+import contextlib
+import errno
+import functools
+import heapq
+import operator
+import pickle
 import logging
-import pandas as pd
+import logging.handlers
 import csv
-import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional, Tuple, List
+from typing import Dict, Iterator, Optional, Tuple, List, NamedTuple
+
+# RE2 matches in linear time from C++; fall back to the stdlib engine when the
+# binding isn't installed. Patterns below stick to the syntax both accept.
+try:
+    import re2 as re_engine
+except ImportError:
+    re_engine = re
+
+# Compiled once at import time; these run for every .pkg file processed.
+# Title ID patterns are tried in order, each over the whole name, so the
+# loose last one only applies when the stricter ones find nothing
+_TITLE_ID_PATTERNS = [
+    # EP9000-BCES00011_00-... or UP9000-BCUS98148_00-... format
+    re_engine.compile(r'[A-Z]{2}\d{4}-([A-Z]{4}\d{5})'),
+    # Direct title ID format BCES-00011 or BCES00011
+    re_engine.compile(r'([A-Z]{4}-?\d{5})'),
+    # More flexible pattern for various formats
+    re_engine.compile(r'([A-Z]{3,4}-?\d{4,5})'),
+]
+# Every title ID carries at least four digits
+_DIGITS = frozenset('0123456789')
+_VERSION_PATTERNS = [
+    # -A0120- / _A0120_ / A0120
+    re_engine.compile(r'(?i)-A(\d{4})-|_A(\d{4})_|A(\d{4})'),
+    # V0600 / V0600- etc
+    re_engine.compile(r'(?i)V(\d{4})'),
+]
+_DOTTED_VERSION_RE = re_engine.compile(r'(?i)v?(\d+\.\d+)')
+# Invalid characters for Windows/Unix filenames, plus trademark symbols that
+# might cause issues; each set is deleted in a single str.translate pass
+_INVALID_CHARS = '<>:"/\\|?*'
+_INVALID_CHARS_TABLE = str.maketrans('', '', _INVALID_CHARS)
+_SANITIZE_TABLE = str.maketrans('', '', _INVALID_CHARS + '™®')
+# BCUS-xxxxx / BCES-xxxxx style IDs used by the mismatch analysis helpers
+_BX_TITLE_ID_RE = re_engine.compile(r'(B[CU][EU]S-?\d{5})')
+_FORMATTED_RE = re_engine.compile(r'.+\s\[UPDATE\s[\d.]+\]\[[A-Z]{4}-\d{5}\]\(axekin\.com\)\.pkg$')
+
+# Bump when the layout of game_data changes so stale pickles are reparsed
+_CSV_CACHE_VERSION = 4
+
+# Number of processed files between two writes of buffered console output
+_CONSOLE_FLUSH_EVERY = 1000
+
+# Threads used to overlap the rename syscalls
+_RENAME_WORKERS = 8
+
+_LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+def _configure_logging(log_file: str) -> None:
+    """
+    Set up the root logger once per process
+    
+    File records go through a MemoryHandler and reach the disk in batches
+    rather than as one write per processed file; errors flush immediately.
+    The log file itself is only opened once the first batch is written.
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    file_handler = logging.FileHandler(log_file, encoding='utf-8', delay=True)
+    file_handler.setFormatter(logging.Formatter(_LOG_FORMAT))
+    logging.basicConfig(
+        level=logging.INFO,
+        format=_LOG_FORMAT,
+        handlers=[
+            logging.handlers.MemoryHandler(capacity=1024, flushLevel=logging.ERROR,
+                                           target=file_handler),
+            logging.StreamHandler()
+        ]
+    )
+
+
+def _hyphenate_title_id(title_id: str) -> str:
+    """
+    Insert a hyphen between the letter prefix and the digits of a bare title ID
+    (BLES01433 -> BLES-01433)
+    """
+    split = len(title_id) - len(title_id.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+    if 0 < split < len(title_id):
+        return f"{title_id[:split]}-{title_id[split:]}"
+    return title_id
+
+
+def _version_key(version: str) -> Tuple[int, ...]:
+    """
+    Sort key for CSV versions (01.20 -> (1, 20)); empty or non-numeric
+    versions sort before every real one
+    """
+    try:
+        return tuple(int(part) for part in version.split('.'))
+    except ValueError:
+        return ()
+
+
+class CSVEntry(NamedTuple):
+    """
+    One row of the title CSV, stored as a tuple rather than a per-row dict
+    """
+    title_id: str
+    version: str
+    name: str
+    editions: str
+    filename: str
+    download_url: str
+
+
+def _rename_no_replace(src: str, dst: str) -> None:
+    """
+    Rename src to dst, raising FileExistsError instead of overwriting dst
+    
+    os.rename already refuses an existing target on Windows but silently
+    replaces it on POSIX, so there the new name is hard-linked first (which
+    fails if it is taken) and the old name dropped afterwards.
+    """
+    if os.name == 'nt':
+        os.rename(src, dst)
+        return
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        raise
+    except OSError:
+        # Filesystem without hard links (FAT/exFAT drives, some SMB shares)
+        if os.path.lexists(dst):
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), dst)
+        os.rename(src, dst)
+        return
+    try:
+        os.unlink(src)
+    except OSError:
+        # Keep the rename all-or-nothing: drop the new link rather than leave
+        # the file under both names
+        os.unlink(dst)
+        raise
+
+
+def _try_rename(job: Tuple[str, str, str, str]) -> Optional[Exception]:
+    """
+    Run one planned rename on a worker thread
+    
+    Args:
+        job: (old name, new name, source path, target path)
+        
+    Returns:
+        None on success, otherwise the exception raised by the rename
+    """
+    try:
+        _rename_no_replace(job[2], job[3])
+    except Exception as e:
+        return e
+    return None
+
 
 class PS3FileRenamer:
-    def __init__(self, csv_file_path: str, directory_path: str, log_file: str = "rename_log.txt"):
+    def __init__(self, csv_file_path: str, directory_path: str, log_file: str = "rename_log.txt",
+                 debug: bool = False, interactive: bool = True):
         """
         Initialize the PS3 File Renamer
         
@@ -16,59 +179,206 @@ class PS3FileRenamer:
             csv_file_path: Path to the CSV file containing game information
             directory_path: Path to directory containing .pkg files to rename
             log_file: Path to log file for audit purposes
+            debug: Print the per-file debug trace and run the extra existence
+                checks around each rename
+            interactive: Offer the single-file test and ask for confirmation
+                before renaming; when False, run() renames straight away
         """
         self.csv_file_path = csv_file_path
         self.directory_path = Path(directory_path)
         self.log_file = log_file
+        self.debug = debug
+        self.interactive = interactive
         self.game_data = {}
+        # title_id -> (needles, by_version, latest) for titles with several CSV rows
+        self.match_index = {}
         
         # Setup logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
+        _configure_logging(log_file)
         self.logger = logging.getLogger(__name__)
         
-        # DEBUG: Afficher le répertoire de travail
-        print(f"DEBUG: Répertoire de travail actuel: {os.getcwd()}")
-        print(f"DEBUG: Répertoire cible spécifié: {self.directory_path}")
-        print(f"DEBUG: Répertoire cible existe: {self.directory_path.exists()}")
-        if self.directory_path.exists():
-            pkg_count = len(list(self.directory_path.glob("*.pkg")))
-            print(f"DEBUG: Nombre de fichiers .pkg trouvés: {pkg_count}")
+        # DEBUG: Afficher le répertoire de travail; le nombre de fichiers .pkg
+        # est donné par rename_files après son unique parcours du dossier
+        if self.debug:
+            print(f"DEBUG: Répertoire de travail actuel: {os.getcwd()}")
+            print(f"DEBUG: Répertoire cible spécifié: {self.directory_path}")
+            print(f"DEBUG: Répertoire cible existe: {self.directory_path.exists()}")
+    
+    def _iter_pkg_files(self) -> Iterator[os.DirEntry]:
+        """
+        Yield the .pkg files in the target directory
+        
+        os.scandir hands back names straight from the directory listing, so no
+        Path object or fnmatch work is needed per entry.
+        """
+        with os.scandir(self.directory_path) as it:
+            for e in it:
+                if os.path.normcase(e.name).endswith('.pkg') and e.is_file():
+                    yield e
     
     def load_csv_data(self) -> bool:
         """
-        Load game data from CSV file into a mapping of title_id -> list[row_dicts]
+        Load game data from CSV file into a mapping of title_id -> list[CSVEntry]
+        
+        Keys use the canonical hyphenated spelling (BLES-01433) that
+        extract_title_id_from_filename also returns, so matching a file is a
+        single lookup.
+        The parsed mapping is pickled next to the CSV and reused as long as
+        the CSV's modification time and size are unchanged.
         """
         try:
-            df = pd.read_csv(self.csv_file_path, dtype=str, keep_default_na=False)
-            self.game_data = {}
-            for _, row in df.iterrows():
-                tid = row.get('Title_ID', '')
-                if not tid:
-                    continue
-                norm_tid = tid.replace('-', '').upper()
-                entry = {
-                    'Title_ID': tid,
-                    'Version': row.get('Version', '').strip(),
-                    'Name': row.get('Title_Name', row.get('Sony_Game_Name', '')).strip(),
-                    'Editions': row.get('Editions', '').strip(),
-                    'Filename': row.get('Filename', '').strip(),
-                    'Download_URL': row.get('Download_URL', '').strip()
-                }
-                self.game_data.setdefault(norm_tid, []).append(entry)
-            self.logger.info(f"Loaded {sum(len(v) for v in self.game_data.values())} CSV entries for {len(self.game_data)} title IDs")
+            stat = os.stat(self.csv_file_path)
+            csv_meta = (_CSV_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+            cache_path = f"{self.csv_file_path}.cache.pkl"
+            counts = self._read_csv_cache(cache_path, csv_meta)
+            if counts is None:
+                counts = self._parse_csv()
+                self._write_csv_cache(cache_path, csv_meta, counts)
+            self._build_match_index()
+            self.logger.info(f"Loaded {counts[0]} CSV entries for {counts[1]} title IDs")
             return True
         except Exception as e:
             self.logger.error(f"Failed to load CSV: {e}")
             return False
     
-    def extract_title_id_from_filename(self, filename: str) -> Optional[str]:
+    def _parse_csv(self) -> Tuple[int, int]:
+        """
+        Parse the CSV into self.game_data
+        
+        Returns:
+            tuple: (entry_count, title_count)
+        """
+        self.game_data = {}
+        entry_count = title_count = 0
+        with open(self.csv_file_path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            # Resolve column positions once; missing optional columns point
+            # at an empty padding cell appended to rows below
+            width = len(header)
+            col = {name: i for i, name in enumerate(header)}
+            # One C-level call pulls all six cells out of a row
+            columns = (
+                col['Title_ID'],
+                col.get('Version', width),
+                col.get('Title_Name', col.get('Sony_Game_Name', width)),
+                col.get('Editions', width),
+                col.get('Filename', width),
+                col.get('Download_URL', width)
+            )
+            pick = operator.itemgetter(*columns)
+            # The empty padding cell is only needed when a column is missing
+            pad = width in columns
+            intern = sys.intern
+            for row in reader:
+                if len(row) != width:
+                    # Ragged row: fit it to the header so stray trailing
+                    # cells can't be read in place of the padding cell
+                    row = row[:width] + [''] * (width - len(row))
+                if pad:
+                    row.append('')
+                tid, version, name, editions, fname, url = pick(row)
+                tid = tid.strip()
+                if not tid:
+                    continue
+                # Names, versions and editions repeat across regional SKUs
+                # and update rows; interning keeps one copy of each
+                norm_tid = intern(_hyphenate_title_id(tid.replace('-', '').upper()))
+                # Title ID and version go into filenames verbatim, so they are
+                # made filename-safe here once rather than for every .pkg file
+                entry = CSVEntry(
+                    intern(tid.translate(_SANITIZE_TABLE)),
+                    intern(version.strip().translate(_SANITIZE_TABLE)),
+                    intern(name.strip()),
+                    intern(editions.strip()),
+                    fname.strip(),
+                    url.strip()
+                )
+                entries = self.game_data.get(norm_tid)
+                if entries is None:
+                    entries = self.game_data[norm_tid] = []
+                    title_count += 1
+                entries.append(entry)
+                entry_count += 1
+        return entry_count, title_count
+    
+    def _build_match_index(self) -> None:
+        """
+        Precompute row selection data for titles with several CSV rows
+        
+        For each such title, store the lowercased Filename/Download_URL values
+        in the order generate_new_filename tries them, a version -> row map,
+        and the row with the highest version. Lowercasing then happens once
+        per CSV row instead of once per row for every .pkg file.
+        """
+        self.match_index = {}
+        for title_id, entries in self.game_data.items():
+            if len(entries) < 2:
+                continue
+            needles = []
+            by_version = {}
+            for e in entries:
+                if e.filename:
+                    needles.append((e.filename.lower(), e))
+                if e.download_url:
+                    needles.append((e.download_url.lower(), e))
+                if e.version:
+                    by_version.setdefault(e.version, e)
+            latest = max(entries, key=lambda e: _version_key(e.version))
+            self.match_index[title_id] = (needles, by_version, latest)
+    
+    def _read_csv_cache(self, cache_path: str, csv_meta: Tuple) -> Optional[Tuple[int, int]]:
+        """
+        Restore self.game_data from the pickle cache if it matches csv_meta
+        
+        Returns:
+            tuple or None: (entry_count, title_count), or None when the cache is
+            missing, stale or unreadable
+        """
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached['meta'] != csv_meta:
+                return None
+            make = CSVEntry._make
+            self.game_data = {title_id: [make(row) for row in rows]
+                              for title_id, rows in cached['data'].items()}
+            return cached['counts']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable CSV cache {cache_path}: {e}")
+            return None
+    
+    def _write_csv_cache(self, cache_path: str, csv_meta: Tuple, counts: Tuple[int, int]) -> None:
+        """
+        Pickle self.game_data for the next run; failures only cost the speedup
+        
+        Rows are stored as plain tuples: a pickled CSVEntry would name the
+        module it was loaded as (__main__ for a normal run), and any other
+        way of loading the script could not read it back. The pickle is
+        written to a temporary file next to the cache and moved into place,
+        so a failed or interrupted dump never leaves a truncated cache behind.
+        """
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path) or '.',
+                                            suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    data = {title_id: [tuple(e) for e in entries]
+                            for title_id, entries in self.game_data.items()}
+                    pickle.dump({'meta': csv_meta, 'data': data, 'counts': counts},
+                                f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            self.logger.warning(f"Could not write CSV cache {cache_path}: {e}")
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def extract_title_id_from_filename(filename: str) -> Optional[str]:
         """
         Extract title ID from various filename formats
         
@@ -78,56 +388,43 @@ class PS3FileRenamer:
         Returns:
             str or None: Extracted title ID or None if not found
         """
-        # Pattern 1: EP9000-BCES00011_00-... or UP9000-BCUS98148_00-... format
-        pattern1 = r'[A-Z]{2}\d{4}-([A-Z]{4}\d{5})'
-        
-        # Pattern 2: Direct title ID format BCES-00011 or BCES00011
-        pattern2 = r'([A-Z]{4}[-]?\d{5})'
-        
-        # Pattern 3: More flexible pattern for various formats
-        pattern3 = r'([A-Z]{3,4}[-]?\d{4,5})'
-        
-        # Pattern 4: New pattern for EP9001-BCES00326 format (your specific case)
-        pattern4 = r'EP\d{4}-([A-Z]{4}\d{5})'
-        
-        # Pattern 5: Any BCES/BCUS/BLES/BLUS etc. format
-        pattern5 = r'([A-Z]{4}\d{5})'
-        
-        for pattern in [pattern1, pattern4, pattern2, pattern5, pattern3]:
-            match = re.search(pattern, filename)
+        # Cheap rejects before running the regex: the shortest title ID
+        # (ABC1234) is 7 characters, and every title ID has digits
+        if len(filename) < 7 or _DIGITS.isdisjoint(filename):
+            return None
+        # EP9000-/EP9001- prefixes and bare BCES00011 IDs are covered by
+        # the first two patterns respectively
+        for pattern in _TITLE_ID_PATTERNS:
+            match = pattern.search(filename)
             if match:
-                title_id = match.group(1)
-                # Normalize format (add hyphen if missing)
-                if len(title_id) == 9 and '-' not in title_id:
-                    title_id = f"{title_id[:4]}-{title_id[4:]}"
-                return title_id
+                # Normalize format (BLES01433 / BLES-01433 -> BLES-01433), the
+                # same canonical form load_csv_data uses for its keys
+                return _hyphenate_title_id(match.group(1).replace('-', ''))
         
         return None
     
-    def extract_version_from_filename(self, filename: str) -> Optional[str]:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def extract_version_from_filename(filename: str) -> Optional[str]:
         """
         Try to get a version string from filename:
           - A0120 -> 01.20
           - V0600 -> 06.00
           - v1.02 or 1.02 -> keep as-is
         """
-        # Try -Axxxx- or Axxxx
-        m = re.search(r'-A(\d{4})-|_A(\d{4})_|A(\d{4})', filename, flags=re.IGNORECASE)
-        if m:
-            digits = next(g for g in m.groups() if g)
-            return f"{digits[:2]}.{digits[2:]}"
-        # Try V0600 / V0600- etc
-        m = re.search(r'V(\d{4})', filename, flags=re.IGNORECASE)
-        if m:
-            digits = m.group(1)
-            return f"{digits[:2]}.{digits[2:]}"
+        for pattern in _VERSION_PATTERNS:
+            m = pattern.search(filename)
+            if m:
+                digits = next(g for g in m.groups() if g)
+                return f"{digits[:2]}.{digits[2:]}"
         # Try explicit dotted versions
-        m = re.search(r'v?(\d+\.\d+)', filename, flags=re.IGNORECASE)
+        m = _DOTTED_VERSION_RE.search(filename)
         if m:
             return m.group(1)
         return None
     
-    def sanitize_filename(self, filename: str) -> str:
+    @staticmethod
+    def sanitize_filename(filename: str) -> str:
         """
         Remove invalid characters from filename
         
@@ -137,57 +434,64 @@ class PS3FileRenamer:
         Returns:
             str: Sanitized filename
         """
-        # Remove invalid characters for Windows/Unix filenames
-        invalid_chars = r'[<>:"/\\|?*]'
-        sanitized = re.sub(invalid_chars, '', filename)
-        # Remove trademark symbols that might cause issues
-        sanitized = sanitized.replace('™', '').replace('®', '')
-        return sanitized
+        return filename.translate(_SANITIZE_TABLE)
     
     def generate_new_filename(self, title_id: str, filename: str) -> Optional[str]:
         """
         Choose the right CSV row for this file (handle multiple rows for same Title_ID)
         and generate the final filename using the CSV 'Version' when possible.
         """
-        norm_tid = title_id.replace('-', '').upper()
-        entries = self.game_data.get(norm_tid)
+        entries = self.game_data.get(title_id)
         if not entries:
-            self.logger.debug(f"No CSV entries for {norm_tid}")
+            self.logger.debug(f"No CSV entries for {title_id}")
             return None
 
         # If single entry, use it
         chosen = entries[0]
         if len(entries) > 1:
+            needles, by_version, latest = self.match_index[title_id]
             # Prefer exact filename match (CSV Filename or URL)
             fname_lower = filename.lower()
-            for e in entries:
-                if e.get('Filename') and e['Filename'].lower() in fname_lower:
-                    chosen = e
-                    break
-                if e.get('Download_URL') and e['Download_URL'].lower() in fname_lower:
+            for needle, e in needles:
+                if needle in fname_lower:
                     chosen = e
                     break
             else:
-                # Try matching by version extracted from filename (A0120 -> 01.20)
+                # Try matching by version extracted from filename (A0120 -> 01.20),
+                # otherwise use the latest update
                 file_ver = self.extract_version_from_filename(filename)
-                if file_ver:
-                    for e in entries:
-                        if e.get('Version') and e['Version'] == file_ver:
-                            chosen = e
-                            break
-                # otherwise keep the first (or could choose latest)
+                chosen = by_version.get(file_ver, latest) if file_ver else latest
+        return self._format_filename(chosen, title_id)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _format_filename(entry: CSVEntry, title_id: str) -> str:
+        """
+        Build the final filename for a CSV row
+        
+        Files of the same title map to the same few rows, so the result is
+        cached per row instead of being sanitized and formatted per file.
+        
+        Args:
+            entry: CSV row chosen for the file
+            title_id: Canonical title ID, used when the row has no name
+            
+        Returns:
+            str: New filename
+        """
         # Build name using CSV values only
-        game_name = chosen.get('Name') or norm_tid
-        version = chosen.get('Version') or ''
-        edition = chosen.get('Editions') or ''
-        # sanitize components
-        game_name = self.sanitize_filename(game_name).strip()
-        edition = self.sanitize_filename(edition).strip()
+        tid = entry.title_id
+        version = entry.version
+        # Only the name needs sanitizing; title ID and version were sanitized
+        # when the CSV was loaded
+        game_name = PS3FileRenamer.sanitize_filename(entry.name or title_id.replace('-', '')).strip()
         # Construct filename: prefer format already used in your UI
-        new_name = f"{game_name} [UPDATE {version}][{chosen.get('Title_ID')}](axekin.com).pkg" if version else f"{game_name} [{chosen.get('Title_ID')}].pkg"
-        return self.sanitize_filename(new_name)
+        if version:
+            return f"{game_name} [UPDATE {version}][{tid}](axekin.com).pkg"
+        return f"{game_name} [{tid}].pkg"
     
-    def is_already_formatted(self, filename: str) -> bool:
+    @staticmethod
+    def is_already_formatted(filename: str) -> bool:
         """
         Check if filename is already in the correct format
         
@@ -197,29 +501,36 @@ class PS3FileRenamer:
         Returns:
             bool: True if already formatted correctly
         """
-        pattern = r'.+\s\[UPDATE\s[\d.]+\]\[[A-Z]{4}-\d{5}\]\(axekin\.com\)\.pkg$'
-        return bool(re.match(pattern, filename))
+        # Nearly every unformatted name fails this suffix test, skipping the regex
+        if not filename.endswith('](axekin.com).pkg'):
+            return False
+        return bool(_FORMATTED_RE.match(filename))
     
-    def verify_file_exists_before_and_after(self, old_path: Path, new_path: Path) -> bool:
+    def verify_file_exists_before_and_after(self, old_path: str, new_path: str) -> bool:
         """
         Verify file exists before renaming and check if rename was successful
         """
+        source_exists = os.path.exists(old_path)
         print(f"DEBUG: Vérification avant renommage:")
-        print(f"  - Fichier source existe: {old_path.exists()}")
+        print(f"  - Fichier source existe: {source_exists}")
         print(f"  - Chemin source: {old_path}")
         print(f"  - Chemin destination: {new_path}")
-        print(f"  - Destination existe déjà: {new_path.exists()}")
+        print(f"  - Destination existe déjà: {os.path.exists(new_path)}")
         
-        if not old_path.exists():
+        if not source_exists:
             print(f"ERREUR: Le fichier source n'existe pas!")
             return False
             
         return True
     
-    def rename_files(self) -> Dict[str, str]:
+    def rename_files(self, pkg_files: Optional[List[os.DirEntry]] = None) -> Dict[str, str]:
         """
         Process and rename files in the specified directory
         
+        Args:
+            pkg_files: .pkg files already listed by the caller; the directory
+                is scanned again only when omitted
+            
         Returns:
             dict: Dictionary of old_filename -> new_filename mappings
         """
@@ -227,78 +538,166 @@ class PS3FileRenamer:
             self.logger.error(f"Directory not found: {self.directory_path}")
             return {}
         
-        print(f"\nDEBUG: Démarrage du renommage dans: {self.directory_path.absolute()}")
+        if self.debug:
+            print(f"\nDEBUG: Démarrage du renommage dans: {self.directory_path.absolute()}")
         
         renamed_files = {}
-        pkg_files = list(self.directory_path.glob("*.pkg"))
+        dir_str = str(self.directory_path)
+        if pkg_files is None:
+            pkg_files = list(self._iter_pkg_files())
         
         if not pkg_files:
             self.logger.warning(f"No .pkg files found in {self.directory_path}")
             return {}
         
         self.logger.info(f"Found {len(pkg_files)} .pkg files to process")
-        print(f"DEBUG: Fichiers .pkg trouvés: {len(pkg_files)}")
+        if self.debug:
+            print(f"DEBUG: Fichiers .pkg trouvés: {len(pkg_files)}")
+            
+            # Afficher les premiers fichiers pour debug
+            print("DEBUG: Premiers fichiers trouvés:")
+            for i, entry in enumerate(pkg_files[:5]):
+                print(f"  {i+1}. {entry.name}")
+        
+        # Names known to be taken; collisions are caught here without a stat()
+        # and _rename_no_replace still guards against anything missed
+        existing_names = {entry.name for entry in pkg_files}
+        
+        # Per-file console output is collected and written in batches rather
+        # than one line-buffered write per print; when stdout isn't a terminal
+        # it only repeats what the log records, so it is dropped unless the
+        # debug trace (which is never logged) is part of it
+        console = io.StringIO()
+        debug = self.debug
+        console_out = sys.stdout if debug or sys.stdout.isatty() else None
+        try:
+            with contextlib.redirect_stdout(console):
+                # Work out every rename up front; a planned target is reserved
+                # right away so two files can't be sent to the same name
+                jobs = []
+                for entry, new_filename in self._plan_renames(pkg_files, existing_names):
+                    file_path = entry.path
+                    new_file_path = os.path.join(dir_str, new_filename)
+                    if debug:
+                        # DEBUG: Vérification avant renommage
+                        if not self.verify_file_exists_before_and_after(file_path, new_file_path):
+                            continue
+                        
+                        print(f"DEBUG: Tentative de renommage:")
+                        print(f"  DE: {file_path}")
+                        print(f"  VERS: {new_file_path}")
+                    existing_names.add(new_filename)
+                    jobs.append((entry.name, new_filename, file_path, new_file_path))
+                
+                # The renames themselves block on the filesystem, so they are
+                # overlapped on a thread pool; results are reported from this
+                # thread in job order
+                with ThreadPoolExecutor(max_workers=_RENAME_WORKERS) as executor:
+                    futures = [executor.submit(_try_rename, job) for job in jobs]
+                    reported = 0
+                    try:
+                        for job, future in zip(jobs, futures):
+                            error = future.result()
+                            reported += 1
+                            self._report_rename(job, error, renamed_files)
+                            if reported % _CONSOLE_FLUSH_EVERY == 0:
+                                self._flush_console(console, console_out)
+                    except BaseException:
+                        # Interrupted (Ctrl+C) or failed: cancel the queued
+                        # renames so the pool only finishes those already
+                        # running, and record every rename that went through
+                        pending = list(zip(jobs, futures))[reported:]
+                        for _, future in pending:
+                            future.cancel()
+                        for job, future in pending:
+                            if not future.cancelled():
+                                self._report_rename(job, future.result(), renamed_files)
+                        raise
+        finally:
+            self._flush_console(console, console_out)
+            # Write out the buffered log records for this batch
+            for handler in logging.getLogger().handlers:
+                handler.flush()
         
-        # Afficher les premiers fichiers pour debug
-        print("DEBUG: Premiers fichiers trouvés:")
-        for i, file_path in enumerate(pkg_files[:5]):
-            print(f"  {i+1}. {file_path.name}")
+        return renamed_files
+    
+    def _report_rename(self, job: Tuple[str, str, str, str], error: Optional[Exception],
+                       renamed_files: Dict[str, str]) -> None:
+        """
+        Log and print the outcome of one rename from the thread pool
         
-        for file_path in pkg_files:
-            filename = file_path.name
+        Args:
+            job: (old name, new name, source path, target path)
+            error: Exception returned by _try_rename, None on success
+            renamed_files: Successful renames, updated in place
+        """
+        filename, new_filename = job[0], job[1]
+        if error is None:
+            renamed_files[filename] = new_filename
+            self.logger.info(f"Renamed: {filename} -> {new_filename}")
+            print(f"✓ SUCCÈS: {filename} -> {new_filename}")
+        elif isinstance(error, FileExistsError):
+            self.logger.warning(f"Target file already exists: {new_filename}")
+        elif isinstance(error, FileNotFoundError):
+            self.logger.error(f"Source file disappeared before renaming {filename}: {error}")
+            print(f"✗ ÉCHEC: Le fichier source n'existe plus: {filename}")
+        elif isinstance(error, PermissionError):
+            self.logger.error(f"Permission denied renaming {filename}: {error}")
+            print(f"✗ ERREUR PERMISSION: {filename} - {error}")
+        else:
+            self.logger.error(f"Error renaming {filename}: {error}")
+            print(f"✗ ERREUR: {filename} - {error}")
+    
+    @staticmethod
+    def _flush_console(console: io.StringIO, stream) -> None:
+        """
+        Write out and reset buffered console output (discarded if stream is None)
+        """
+        if stream is not None and console.tell():
+            stream.write(console.getvalue())
+            stream.flush()
+        console.seek(0)
+        console.truncate()
+    
+    def _plan_renames(self, pkg_files: List[os.DirEntry],
+                      existing_names: set) -> Iterator[Tuple[os.DirEntry, str]]:
+        """
+        Yield (entry, new_filename) for every file that should be renamed
+        
+        Lazy, so the collision check sees existing_names as the caller
+        reserves each planned target. Every derived value (title ID, version,
+        lowercased name) is computed at most once per file.
+        """
+        # Bound once for the per-file loop
+        is_fmt = self.is_already_formatted
+        extract_tid = self.extract_title_id_from_filename
+        gen = self.generate_new_filename
+        log_info = self.logger.info
+        log_warn = self.logger.warning
+        
+        for entry in pkg_files:
+            filename = entry.name
             
             # Skip if already formatted
-            if self.is_already_formatted(filename):
-                self.logger.info(f"Skipping already formatted file: {filename}")
+            if is_fmt(filename):
+                log_info(f"Skipping already formatted file: {filename}")
                 continue
             
             # Extract title ID
-            title_id = self.extract_title_id_from_filename(filename)
+            title_id = extract_tid(filename)
             if not title_id:
-                self.logger.warning(f"Could not extract title ID from: {filename}")
+                log_warn(f"Could not extract title ID from: {filename}")
                 continue
             
             # Generate new filename
-            new_filename = self.generate_new_filename(title_id, filename)
+            new_filename = gen(title_id, filename)
             if not new_filename:
                 continue
+            if new_filename in existing_names:
+                log_warn(f"Target file already exists: {new_filename}")
+                continue
             
-            # Perform rename
-            new_file_path = file_path.parent / new_filename
-            
-            try:
-                if new_file_path.exists():
-                    self.logger.warning(f"Target file already exists: {new_filename}")
-                    continue
-                
-                # DEBUG: Vérification avant renommage
-                if not self.verify_file_exists_before_and_after(file_path, new_file_path):
-                    continue
-                
-                print(f"DEBUG: Tentative de renommage:")
-                print(f"  DE: {file_path}")
-                print(f"  VERS: {new_file_path}")
-                
-                # Effectuer le renommage
-                file_path.rename(new_file_path)
-                
-                # Vérifier que le renommage a réussi
-                if new_file_path.exists() and not file_path.exists():
-                    renamed_files[filename] = new_filename
-                    self.logger.info(f"Renamed: {filename} -> {new_filename}")
-                    print(f"✓ SUCCÈS: {filename} -> {new_filename}")
-                else:
-                    print(f"✗ ÉCHEC: Le renommage a échoué pour {filename}")
-                    self.logger.error(f"Rename failed for {filename}")
-                
-            except PermissionError as e:
-                self.logger.error(f"Permission denied renaming {filename}: {e}")
-                print(f"✗ ERREUR PERMISSION: {filename} - {e}")
-            except Exception as e:
-                self.logger.error(f"Error renaming {filename}: {e}")
-                print(f"✗ ERREUR: {filename} - {e}")
-        
-        return renamed_files
+            yield entry, new_filename
     
     def check_directory_permissions(self) -> bool:
         """
@@ -315,6 +714,56 @@ class PS3FileRenamer:
             print(f"  Erreur: {e}")
             return False
     
+    def _try_first_file(self, pkg_files: List[os.DirEntry]) -> Optional[List[os.DirEntry]]:
+        """
+        Offer to rename the first file alone before the full pass
+        
+        Args:
+            pkg_files: .pkg files found in the directory
+            
+        Returns:
+            list or None: Files still to rename (without the test file if its
+            new name was kept), or None if the test rename failed
+        """
+        if not pkg_files:
+            return pkg_files
+        test_file = Path(pkg_files[0].path)
+        print(f"\nTEST avec le premier fichier: {test_file.name}")
+        
+        if self.is_already_formatted(test_file.name):
+            return pkg_files
+        title_id = self.extract_title_id_from_filename(test_file.name)
+        if not title_id:
+            return pkg_files
+        new_name = self.generate_new_filename(title_id, test_file.name)
+        if not new_name:
+            return pkg_files
+        print(f"Title ID: {title_id}")
+        print(f"Nouveau nom proposé: {new_name}")
+        
+        # Ask for single file test
+        choice = input(f"\nVoulez-vous tester le renommage sur ce fichier uniquement? (y/n): ").lower().strip()
+        if choice not in ['y', 'yes', 'o', 'oui']:
+            return pkg_files
+        new_path = test_file.parent / new_name
+        try:
+            print(f"Renommage de: {test_file}")
+            print(f"Vers: {new_path}")
+            test_file.rename(new_path)
+            print("✓ TEST RÉUSSI!")
+            
+            # Restore original name
+            restore = input("Voulez-vous restaurer le nom original? (y/n): ").lower().strip()
+            if restore in ['y', 'yes', 'o', 'oui']:
+                new_path.rename(test_file)
+                print("✓ Nom original restauré")
+                return pkg_files
+            # Already renamed, leave it out of the main pass
+            return pkg_files[1:]
+        except Exception as e:
+            print(f"✗ TEST ÉCHOUÉ: {e}")
+            return None
+    
     def run(self) -> bool:
         """
         Main execution method with permission checks
@@ -327,81 +776,66 @@ class PS3FileRenamer:
             print("Essayez de lancer le script avec sudo ou changez les permissions du dossier.")
             return False
         
-        # Load CSV data
-        if not self.load_csv_data():
+        # Load CSV data unless the caller already did
+        if not self.game_data and not self.load_csv_data():
             return False
         
-        # Simple test with first file
-        pkg_files = list(self.directory_path.glob("*.pkg"))
-        if pkg_files:
-            test_file = pkg_files[0]
-            print(f"\nTEST avec le premier fichier: {test_file.name}")
+        pkg_files = list(self._iter_pkg_files())
+        # Simple test with first file and confirmation; batch runs skip both
+        if self.interactive:
+            pkg_files = self._try_first_file(pkg_files)
+            if pkg_files is None:
+                return False
             
-            if not self.is_already_formatted(test_file.name):
-                title_id = self.extract_title_id_from_filename(test_file.name)
-                if title_id:
-                    new_name = self.generate_new_filename(title_id, test_file.name)
-                    if new_name:
-                        print(f"Title ID: {title_id}")
-                        print(f"Nouveau nom proposé: {new_name}")
-                        
-                        # Ask for single file test
-                        choice = input(f"\nVoulez-vous tester le renommage sur ce fichier uniquement? (y/n): ").lower().strip()
-                        if choice in ['y', 'yes', 'o', 'oui']:
-                            new_path = test_file.parent / new_name
-                            try:
-                                print(f"Renommage de: {test_file}")
-                                print(f"Vers: {new_path}")
-                                test_file.rename(new_path)
-                                print("✓ TEST RÉUSSI!")
-                                
-                                # Restore original name
-                                restore = input("Voulez-vous restaurer le nom original? (y/n): ").lower().strip()
-                                if restore in ['y', 'yes', 'o', 'oui']:
-                                    new_path.rename(test_file)
-                                    print("✓ Nom original restauré")
-                                
-                            except Exception as e:
-                                print(f"✗ TEST ÉCHOUÉ: {e}")
-                                return False
-        
-        # Continue with normal process...
-        print("\nVoulez-vous continuer avec tous les fichiers? (y/n): ")
-        if input().lower().strip() not in ['y', 'yes', 'o', 'oui']:
-            return False
+            # Continue with normal process...
+            print("\nVoulez-vous continuer avec tous les fichiers? (y/n): ")
+            if input().lower().strip() not in ['y', 'yes', 'o', 'oui']:
+                return False
         
         # Perform rename on all files
-        renamed_files = self.rename_files()
+        renamed_files = self.rename_files(pkg_files)
         
         # Summary
         print(f"\nRÉSULTAT FINAL: {len(renamed_files)} fichiers renommés avec succès")
         return True
 
 
-def analyze_renaming_issues():
+@functools.lru_cache(maxsize=4)
+def _load_csv_rows(csv_file_path: str) -> List[Dict[str, str]]:
+    """
+    Read the CSV as a list of row dicts, parsed once per path and shared by
+    the analysis helpers
+    """
+    with open(csv_file_path, newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+def analyze_renaming_issues(rows: Optional[List[Dict[str, str]]] = None,
+                            pkg_files: Optional[List[Path]] = None):
     # Charger le CSV
-    df = pd.read_csv('ps3_titles_download_links.csv')
+    if rows is None:
+        rows = _load_csv_rows('ps3_titles_download_links.csv')
     
-    # Répertoire contenant les fichiers PKG
-    pkg_directory = Path('.')  # Ajustez le chemin selon votre configuration
-    
-    # Lister tous les fichiers PKG
-    pkg_files = list(pkg_directory.glob('*.pkg'))
+    if pkg_files is None:
+        # Répertoire contenant les fichiers PKG
+        pkg_directory = Path('.')  # Ajustez le chemin selon votre configuration
+        
+        # Lister tous les fichiers PKG
+        pkg_files = list(pkg_directory.glob('*.pkg'))
     
     print(f"Nombre de fichiers PKG trouvés : {len(pkg_files)}")
-    print(f"Nombre d'entrées dans le CSV : {len(df)}")
+    print(f"Nombre d'entrées dans le CSV : {len(rows)}")
     
     # Extraire les Title_ID des noms de fichiers
     file_title_ids = set()
     for file in pkg_files:
         # Pattern pour extraire le Title_ID du nom de fichier (BCUS-xxxxx ou BCES-xxxxx)
-        match = re.search(r'(B[CU][EU]S-?\d{5})', file.name)
+        match = _BX_TITLE_ID_RE.search(file.name)
         if match:
             title_id = match.group(1).replace('-', '')  # Supprimer le tiret si présent
             file_title_ids.add(title_id)
     
-    # Title_ID du CSV (nettoyer les tirets)
-    csv_title_ids = set(df['Title_ID'].str.replace('-', ''))
+    # Title_ID du CSV (nettoyer les tirets), en une seule passe sur les lignes
+    csv_title_ids = {tid.replace('-', '') for tid in map(operator.itemgetter('Title_ID'), rows) if tid}
     
     # Analyser les différences
     files_not_in_csv = file_title_ids - csv_title_ids
@@ -415,22 +849,25 @@ def analyze_renaming_issues():
     
     if files_not_in_csv:
         print(f"\nTitle_ID dans les fichiers mais absents du CSV :")
-        for tid in sorted(files_not_in_csv)[:10]:  # Afficher les 10 premiers
+        for tid in heapq.nsmallest(10, files_not_in_csv):  # Afficher les 10 premiers
             print(f"  - {tid}")
     
     if csv_not_in_files:
         print(f"\nTitle_ID dans le CSV mais absents des fichiers :")
-        for tid in sorted(csv_not_in_files)[:10]:  # Afficher les 10 premiers
+        for tid in heapq.nsmallest(10, csv_not_in_files):  # Afficher les 10 premiers
             print(f"  - {tid}")
     
-    return df, pkg_files, common_title_ids
+    return rows, pkg_files, common_title_ids
 
-def improved_rename_files():
-    df, pkg_files, common_title_ids = analyze_renaming_issues()
+def improved_rename_files(rows: Optional[List[Dict[str, str]]] = None,
+                          pkg_files: Optional[List[Path]] = None):
+    # Réutiliser les données de l'analyse si elles sont fournies
+    if rows is None or pkg_files is None:
+        rows, pkg_files, _ = analyze_renaming_issues(rows, pkg_files)
     
     # Créer un dictionnaire de mapping Title_ID -> Informations du jeu
     title_mapping = {}
-    for _, row in df.iterrows():
+    for row in rows:
         title_id = row['Title_ID'].replace('-', '')
         title_mapping[title_id] = {
             'name': row['Title_Name'],
@@ -444,7 +881,7 @@ def improved_rename_files():
     
     for file in pkg_files:
         # Extraire le Title_ID du fichier
-        match = re.search(r'(B[CU][EU]S-?\d{5})', file.name)
+        match = _BX_TITLE_ID_RE.search(file.name)
         if not match:
             failed_renames.append(f"Pas de Title_ID trouvé dans : {file.name}")
             continue
@@ -459,7 +896,7 @@ def improved_rename_files():
         game_info = title_mapping[title_id]
         
         # Nettoyer le nom du jeu pour le nom de fichier
-        clean_name = re.sub(r'[<>:"/\\|?*]', '', game_info['name'])
+        clean_name = game_info['name'].translate(_INVALID_CHARS_TABLE)
         clean_name = clean_name.strip()
         
         # Construire le nouveau nom de fichier
@@ -513,7 +950,18 @@ def main():
         print(f"Error: CSV file not found: {csv_file_path}")
         return
     
-    directory_path = input("Enter the path to the folder containing .pkg files: ").strip()
+    # --yes or PS3_RENAMER_YES=1 runs without any prompt (cron, CI); the
+    # folder can then be given as an argument
+    args = sys.argv[1:]
+    interactive = '--yes' not in args and os.environ.get('PS3_RENAMER_YES') != '1'
+    args = [a for a in args if a != '--yes']
+    
+    if args:
+        directory_path = args[0]
+    elif interactive:
+        directory_path = input("Enter the path to the folder containing .pkg files: ").strip()
+    else:
+        directory_path = ''
     
     if not directory_path:
         print("No path provided. Stopping program.")
@@ -524,9 +972,9 @@ def main():
         return
     
     # Create renamer instance
-    renamer = PS3FileRenamer(csv_file_path, directory_path)
+    renamer = PS3FileRenamer(csv_file_path, directory_path, interactive=interactive)
     
-    # Load CSV data
+    # Load CSV data (run() reuses it)
     if not renamer.load_csv_data():
         return
     
@@ -538,17 +986,20 @@ def main():
     else:
         print("\nErrors were encountered. Check the debug output above.")
     
-    # D'abord analyser le problème
+    # D'abord analyser le problème; le CSV et le dossier ne sont lus qu'une
+    # fois pour l'analyse et le renommage amélioré
     print("=== ANALYSE DU PROBLÈME ===")
-    analyze_renaming_issues()
+    rows = _load_csv_rows(csv_file_path)
+    pkg_files = list(Path(directory_path).glob('*.pkg'))
+    analyze_renaming_issues(rows, pkg_files)
     
     print("\n" + "="*50)
     print("=== RENOMMAGE AMÉLIORÉ ===")
     
-    # Demander confirmation
-    response = input("\nVoulez-vous procéder au renommage ? (o/n): ")
-    if response.lower() in ['o', 'oui', 'y', 'yes']:
-        improved_rename_files()
+    # Demander confirmation; this pass renames the files run() just named,
+    # so a batch run never approves it on its own
+    if interactive and input("\nVoulez-vous procéder au renommage ? (o/n): ").lower() in ['o', 'oui', 'y', 'yes']:
+        improved_rename_files(rows, pkg_files)
     else:
         print("Renommage annulé.")
 